@@ -7,17 +7,28 @@ Drag-and-drop Image Converter for Windows/Mac/Linux
 - Then drop a destination folder on the MOVE area to move converted files there.
 
 Dependencies:
-  pip install pillow tkinterdnd2
+  pip install pillow-simd tkinterdnd2
+
+Pillow-SIMD is a drop-in, SIMD-accelerated build of Pillow (plain `pillow`
+also works). Uninstall `pillow` first. Where no wheel is available it builds
+from source and needs a C compiler; for AVX2:
+  pip uninstall pillow
+  CC="cc -mavx2" CFLAGS="-mavx2" pip install -U --force-reinstall pillow-simd
 
 Note: On some systems you may need the tkdnd DLL that comes with tkinterdnd2.
 """
 
 import sys
+import os
+import io
+import time
 import threading
 import shutil
+# queue and concurrent.futures aren't otherwise loaded at startup; they're imported
+# where a conversion or move first needs them.
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 try:
     # Tk base
@@ -35,14 +46,20 @@ except Exception as e:
     TkinterDnD = None
 
 # Imaging
+# Safeguard only: if any imaging library linked in here uses OpenMP, keep it single-threaded
+# so it doesn't oversubscribe cores alongside the conversion thread pool.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
 try:
+    import PIL
     from PIL import Image, ImageEnhance, ImageFilter, ImageOps
 except Exception as e:
-    print("Pillow (PIL) is required. Install with: pip install pillow")
+    print("Pillow (PIL) is required. Install with: pip install pillow-simd (or pip install pillow)")
     sys.exit(1)
 
 
 SUPPORTED_INPUTS = {".webp", ".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".gif", ".heic"}
+# Same set without the leading dot, for matching raw file names during folder scans
+EXT_NO_DOT = {ext[1:] for ext in SUPPORTED_INPUTS}
 # Output choices (JPG is a user-facing alias for Pillow's JPEG encoder)
 OUTPUT_FORMATS = ["JPG", "JPEG", "PNG", "WEBP", "TIFF", "BMP"]
 
@@ -54,10 +71,59 @@ UPSCALE_OPTIONS = {
     "200% (2×)": 2.0,
 }
 
+# Minimum seconds between progress bar updates from the conversion worker (~30Hz)
+PROGRESS_INTERVAL = 0.033
+
+# Concurrent file moves when relocating converted output
+MOVE_WORKERS = 8
+
+# Source files read ahead of the encoders during conversion
+READAHEAD_FILES = 4
+
 _RESAMPLE_LANCZOS = getattr(Image, "Resampling", Image).LANCZOS
 
 def is_image_file(p: Path) -> bool:
-    return p.suffix.lower() in SUPPORTED_INPUTS and p.is_file()
+    # Cheap string check on the name first; only stat files with a supported extension
+    name = p.name
+    dot = name.rfind(".")
+    return dot > 0 and name[dot:].lower() in SUPPORTED_INPUTS and p.is_file()
+
+def _reserve_output_path(out_dir: Path, stem: str, ext: str, taken: Set[str]) -> Path:
+    """Return out_dir/stem+ext, or out_dir/"stem (i)"+ext if taken; adds the name to *taken*."""
+    name = f"{stem}{ext}"
+    i = 1
+    while os.path.normcase(name) in taken:
+        name = f"{stem} ({i}){ext}"
+        i += 1
+    taken.add(os.path.normcase(name))
+    return out_dir / name
+
+def _scan_folder(root: Path) -> List[Path]:
+    """Recursively collect supported images under *root* in a single directory walk."""
+    found: List[Path] = []
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    # Require a stem, like is_image_file: a bare ".png" isn't an image
+                    head, dot, ext = entry.name.rpartition(".")
+                    if head and dot and ext.lower() in EXT_NO_DOT and entry.is_file():
+                        found.append(Path(entry.path))
+                except OSError:
+                    continue
+    return found
+
+def _dedup_key(p: Path) -> str:
+    """Queue dedup key: absolute, case-normalized path string. Pure string work, no filesystem calls."""
+    return os.path.normcase(os.path.abspath(str(p)))
 
 def normalize_dnd_paths(widget, data: str) -> List[Path]:
     """Turn a Tk DND_FILES payload into a list of Path objects."""
@@ -73,19 +139,40 @@ def normalize_dnd_paths(widget, data: str) -> List[Path]:
             paths.append(p)
     return paths
 
+# UI format -> (pil_format, extension, is_jpeg)
+_FMT_TABLE = {
+    "JPG": ("JPEG", "jpg", True),
+    "JPEG": ("JPEG", "jpeg", True),
+    "PNG": ("PNG", "png", False),
+    "WEBP": ("WEBP", "webp", False),
+    "TIFF": ("TIFF", "tiff", False),
+    "BMP": ("BMP", "bmp", False),
+}
+
+# Source extension -> Pillow format, for spotting same-format conversions
+_EXT_TO_PIL = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".webp": "WEBP",
+    ".tif": "TIFF",
+    ".tiff": "TIFF",
+    ".bmp": "BMP",
+}
+
+# Quality at or above which WebP uses its slowest, best-compression encoder setting
+WEBP_BEST_QUALITY = 95
+
+# Quality at which a same-format JPEG/WebP source is copied byte-for-byte instead of re-encoded
+NO_RECOMPRESS_QUALITY = 100
+
 def _resolve_output_fmt(fmt: str):
     """
-    Map UI format to (pil_format, extension, is_jpeg_bool).
-    - 'JPG'  -> ('JPEG', 'jpg',  True)
-    - 'JPEG' -> ('JPEG', 'jpeg', True)
-    - others -> (UPPER, lower,  False)
+    Map UI format to (pil_format, extension, is_jpeg_bool) via _FMT_TABLE.
+    Unknown formats fall back to (UPPER, lower, False).
     """
     f = fmt.upper()
-    if f == "JPG":
-        return ("JPEG", "jpg", True)
-    if f == "JPEG":
-        return ("JPEG", "jpeg", True)
-    return (f, f.lower(), False)
+    return _FMT_TABLE.get(f) or (f, f.lower(), False)
 
 def _apply_upscale(im: Image.Image, scale: float) -> Image.Image:
     """Return an upscaled copy of *im* when scale > 1. Uses high-quality Lanczos."""
@@ -97,57 +184,121 @@ def _apply_upscale(im: Image.Image, scale: float) -> Image.Image:
         return im
     return im.resize(new_size, _RESAMPLE_LANCZOS)
 
+# Cap on cached white backgrounds (one full frame each) held per batch
+_BG_CACHE_MAX = 8
 
-def export_image(
-    src: Path,
+def _white_background(size: Tuple[int, int], bg_cache: Optional[Dict[Tuple[int, int], Image.Image]]) -> Image.Image:
+    """
+    Take a white RGB canvas of *size* out of *bg_cache* (refilled), or allocate one.
+    Popping means concurrent conversions sharing the cache never get the same canvas.
+    """
+    bg = bg_cache.pop(size, None) if bg_cache is not None else None
+    if bg is None:
+        return Image.new("RGB", size, (255, 255, 255))
+    bg.paste((255, 255, 255), (0, 0) + size)
+    return bg
+
+
+def _prepare_jpeg(im: Image.Image, bg_cache) -> Tuple[Image.Image, Optional[Image.Image]]:
+    """Return (image_to_save, cached_background_or_None) for a JPEG target."""
+    if im.format == "JPEG" and im.mode == "RGB":
+        # JPEG -> JPEG: have libjpeg emit RGB directly so no conversion pass is needed
+        im.draft("RGB", im.size)
+    # JPEG doesn't support alpha; flatten transparent images onto white
+    # with a single masked paste (one buffer, one pass).
+    if im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info):
+        src_im = im.convert("RGBA") if im.mode == "P" else im
+        background = _white_background(src_im.size, bg_cache)
+        background.paste(src_im, mask=src_im.getchannel("A"))
+        return background, background
+    if im.mode == "RGB":
+        return im, None
+    return im.convert("RGB"), None
+
+def _prepare_png(im: Image.Image, bg_cache) -> Tuple[Image.Image, Optional[Image.Image]]:
+    if im.mode == "P":
+        return im.convert("RGBA"), None
+    return im, None
+
+def _prepare_passthrough(im: Image.Image, bg_cache) -> Tuple[Image.Image, Optional[Image.Image]]:
+    return im, None
+
+
+def make_exporter(
     out_dir: Path,
-    fmt: str,
+    pil_fmt: str,
+    is_jpeg: bool,
     quality: int,
     keep_exif: bool,
-    suffix: str,
     scale: float,
-) -> Path:
+    bg_cache: Optional[Dict[Tuple[int, int], Image.Image]] = None,
+) -> Tuple[Callable[..., Optional[Path]], Callable[[Path], bool]]:
+    """
+    Specialize conversion for one batch's fixed settings. Creates *out_dir*.
+    Returns (process_one, is_copy_candidate):
+    - process_one(src, out_path, data=None) converts one file, decoding *data* if given.
+      It returns None if the image is too large to decode safely.
+    - is_copy_candidate(src) says whether *src* will likely be copied, not decoded.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    pil_fmt, out_ext, is_jpeg = _resolve_output_fmt(fmt)
-    stem = src.stem
-    out_name = f"{stem}{suffix}.{out_ext}"
-    out_path = out_dir / out_name
-
-    with Image.open(src) as im:
-        save_kwargs = {}
-        if is_jpeg:
-            # JPEG doesn't support alpha; flatten transparent images onto white
-            if im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info):
-                rgba = im.convert("RGBA")
-                background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
-                im_to_save = Image.alpha_composite(background, rgba).convert("RGB")
-            else:
-                im_to_save = im.convert("RGB")
-            save_kwargs["quality"] = quality
-            save_kwargs["optimize"] = True
-            save_kwargs["progressive"] = True
-        elif pil_fmt in ("PNG", "TIFF", "WEBP", "BMP"):
-            im_to_save = im
-            if pil_fmt == "WEBP":
-                save_kwargs["quality"] = quality
-                save_kwargs["method"] = 6
-                save_kwargs["lossless"] = False
-            if pil_fmt == "PNG" and im.mode == "P":
-                im_to_save = im.convert("RGBA")
-        else:
-            # Fallback
-            im_to_save = im
+    if is_jpeg:
+        prepare = _prepare_jpeg
+        base_save_kwargs = {"quality": quality, "optimize": True, "progressive": True}
+    elif pil_fmt == "PNG":
+        prepare = _prepare_png
+        base_save_kwargs = {}
+    elif pil_fmt == "WEBP":
+        prepare = _prepare_passthrough
+        # method 6 is libwebp's slowest effort level; only worth it when asking for top quality
+        method = 6 if quality >= WEBP_BEST_QUALITY else 4
+        base_save_kwargs = {"quality": quality, "method": method, "lossless": False}
+    else:
+        prepare = _prepare_passthrough
+        base_save_kwargs = {}
+
+    upscale = bool(scale and scale > 1.0)
+    # Lossy target, same format, metadata kept, max quality, no resize: re-encoding could
+    # only lose data, so such files are copied as-is, skipping decode/encode entirely.
+    # Lossless targets ignore the quality slider and always re-encode.
+    can_copy = pil_fmt in ("JPEG", "WEBP") and keep_exif and quality >= NO_RECOMPRESS_QUALITY and not upscale
+    def is_copy_candidate(src: Path) -> bool:
+        return can_copy and _EXT_TO_PIL.get(src.suffix.lower()) == pil_fmt
+
+    def process_one(src: Path, out_path: Path, data: Optional[bytes] = None) -> Optional[Path]:
+        try:
+            im = Image.open(io.BytesIO(data) if data is not None else src)
+        except Image.DecompressionBombError as e:
+            print(f"Skipped (too large): {src} -> {e}")
+            return None
+
+        with im:
+            # The extension only nominates a copy; Image.open has read just the header,
+            # so confirm the real format before copying (a mislabelled file gets re-encoded).
+            if is_copy_candidate(src) and im.format == pil_fmt:
+                try:
+                    shutil.copy2(src, out_path)
+                except shutil.SameFileError:
+                    pass  # output folder is the source folder with no suffix: already in place
+                return out_path
 
-        if scale and scale > 1.0:
-            im_to_save = _apply_upscale(im_to_save, scale)
+            im_to_save, background = prepare(im, bg_cache)
+            if upscale:
+                im_to_save = _apply_upscale(im_to_save, scale)
+            save_kwargs = base_save_kwargs
+            if keep_exif and "exif" in im.info:
+                save_kwargs = {**base_save_kwargs, "exif": im.info["exif"]}
+            im_to_save.save(out_path, pil_fmt, **save_kwargs)
 
-        if keep_exif and "exif" in im.info:
-            save_kwargs["exif"] = im.info["exif"]
+            # Hand the flattening canvas back for the next same-sized image
+            if bg_cache is not None and background is not None:
+                if len(bg_cache) >= _BG_CACHE_MAX:
+                    bg_cache.clear()
+                bg_cache[background.size] = background
 
-        im_to_save.save(out_path, pil_fmt, **save_kwargs)
+        return out_path
 
-    return out_path
+    return process_one, is_copy_candidate
 
 
 class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
@@ -159,6 +310,8 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
 
         self.queue: List[Path] = []
         self.converted_paths: List[Path] = []
+        # Dedup keys of everything in self.queue, kept in sync for O(1) lookups
+        self._queued_keys: Set[str] = set()
 
         self._build_ui()
         self._wire_dnd()
@@ -358,6 +511,9 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         self.quality_var.set(value)
         self.quality_label.config(text=str(value))
 
+    def _set_progress(self, value: int):
+        self.progress.config(value=value)
+
     def choose_output_dir(self):
         chosen = filedialog.askdirectory(title="Choose Output Folder")
         if chosen:
@@ -373,6 +529,7 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
 
     def clear_queue(self):
         self.queue.clear()
+        self._queued_keys.clear()
         self.queue_list.delete(0, "end")
         self.status_var.set("Cleared list.")
 
@@ -380,12 +537,23 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         sel = list(self.queue_list.curselection())
         if not sel:
             return
-        for idx in reversed(sel):
-            try:
-                self.queue.pop(idx)
-                self.queue_list.delete(idx)
-            except Exception:
-                pass
+        # Rebuild in one pass; popping each index shifts the list every time (O(N) per removal)
+        selected = set(sel)
+        remaining: List[Path] = []
+        for idx, p in enumerate(self.queue):
+            if idx in selected:
+                self._queued_keys.discard(_dedup_key(p))
+            else:
+                remaining.append(p)
+        self.queue = remaining
+        # Delete only the selected rows, bottom-up so earlier indices stay valid,
+        # one delete(first, last) call per contiguous run
+        sel.sort()
+        run_end = len(sel) - 1
+        for i in range(len(sel) - 1, -1, -1):
+            if i == 0 or sel[i - 1] != sel[i] - 1:
+                self.queue_list.delete(sel[i], sel[run_end])
+                run_end = i - 1
         self.status_var.set(f"Removed {len(sel)} item(s).")
 
     def on_drop_files(self, event):
@@ -394,8 +562,7 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         files: List[Path] = []
         for p in paths:
             if p.is_dir():
-                for ext in SUPPORTED_INPUTS:
-                    files.extend(p.rglob(f"*{ext}"))
+                files.extend(_scan_folder(p))
             elif is_image_file(p):
                 files.append(p)
         if not files:
@@ -407,15 +574,17 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         new_files = [p for p in files if is_image_file(p)]
         if not new_files:
             return
-        existing = {str(p.resolve()) for p in self.queue}
-        added = 0
+        existing = self._queued_keys
+        new_paths_str: List[str] = []
         for p in new_files:
-            rp = str(p.resolve())
+            rp = _dedup_key(p)
             if rp not in existing:
                 self.queue.append(p)
-                self.queue_list.insert("end", str(p))
+                new_paths_str.append(str(p))
                 existing.add(rp)
-                added += 1
+        if new_paths_str:
+            self.queue_list.insert("end", *new_paths_str)
+        added = len(new_paths_str)
         self.status_var.set(f"Added {added} file(s). Total in queue: {len(self.queue)}.")
 
     def on_drop_move_folder(self, event):
@@ -442,26 +611,44 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         if not self.converted_paths:
             messagebox.showinfo("Nothing to move", "Convert some files first, then try moving them.")
             return
-        moved = 0
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
         dest.mkdir(parents=True, exist_ok=True)
-        for src in list(self.converted_paths):
-            try:
-                target = dest / src.name
-                if target.exists():
-                    stem = src.stem
-                    ext = src.suffix
-                    i = 1
-                    while True:
-                        candidate = dest / f"{stem} ({i}){ext}"
-                        if not candidate.exists():
-                            target = candidate
-                            break
-                        i += 1
-                shutil.move(str(src), str(target))
-                moved += 1
-                self.converted_paths.remove(src)
-            except Exception as e:
-                print("Move failed:", e)
+
+        # Pick unique target names serially; names claimed earlier in this batch
+        # count as taken even though nothing has been moved there yet.
+        # Dedupe first: two concurrent moves of one source would both copy it across devices
+        self.converted_paths = list(dict.fromkeys(self.converted_paths))
+        pairs = []
+        reserved: Set[Path] = set()
+        for src in self.converted_paths:
+            target = dest / src.name
+            if target in reserved or target.exists():
+                stem = src.stem
+                ext = src.suffix
+                i = 1
+                while True:
+                    candidate = dest / f"{stem} ({i}){ext}"
+                    if candidate not in reserved and not candidate.exists():
+                        target = candidate
+                        break
+                    i += 1
+            reserved.add(target)
+            pairs.append((src, target))
+
+        # shutil.move renames when it can and copies+deletes across devices;
+        # the copies are I/O-bound, so run them side by side
+        moved_srcs: Set[Path] = set()
+        with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as ex:
+            futures = {ex.submit(shutil.move, str(src), str(target)): src for src, target in pairs}
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                    moved_srcs.add(futures[fut])
+                except Exception as e:
+                    print("Move failed:", e)
+        self.converted_paths = [p for p in self.converted_paths if p not in moved_srcs]
+        moved = len(moved_srcs)
         self.status_var.set(f"Moved {moved} file(s) to: {dest}")
         if moved:
             messagebox.showinfo("Move complete", f"Moved {moved} file(s) to:\n{dest}")
@@ -470,6 +657,9 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         if not self.queue:
             messagebox.showinfo("No files", "Add or drop some images first.")
             return
+        import queue
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
         out_dir = Path(self.output_dir_var.get())
         fmt = self.format_var.get().upper()
         quality = int(self.quality_var.get())
@@ -481,6 +671,15 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         if fmt not in (f.upper() for f in OUTPUT_FORMATS):
             messagebox.showerror("Unsupported format", f"{fmt} is not supported.")
             return
+        # Everything below is invariant for the whole batch: specialize the exporter once
+        pil_fmt, out_ext, is_jpeg = _resolve_output_fmt(fmt)
+        try:
+            process_one, is_copy_candidate = make_exporter(
+                out_dir, pil_fmt, is_jpeg, quality, keep_exif, scale, bg_cache={},
+            )
+        except OSError as e:
+            messagebox.showerror("Output folder", f"Can't use output folder:\n{out_dir}\n\n{e}")
+            return
 
         self.convert_btn.config(state="disabled")
         self.progress.config(mode="determinate", value=0, maximum=len(self.queue))
@@ -490,16 +689,69 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
         def worker():
             successes = 0
             failures = 0
-            for idx, src in enumerate(list(self.queue)):
-                try:
-                    out_path = export_image(src, out_dir, fmt, quality, keep_exif, suffix, scale)
-                    self.converted_paths.append(out_path)
-                    successes += 1
-                except Exception as e:
-                    print(f"Failed: {src} -> {e}")
-                    failures += 1
-                finally:
-                    self.progress.after(0, lambda v=idx+1: self.progress.config(value=v))
+            sources = list(self.queue)
+            total = len(sources)
+            done_count = 0
+            last_tick = 0.0
+
+            # Reader thread: pull file bytes off disk while earlier files encode.
+            # Whole files held in memory: up to READAHEAD_FILES waiting in read_q
+            # plus one per in-flight task (capped at n_workers below).
+            read_q = queue.Queue(maxsize=READAHEAD_FILES)
+
+            def reader():
+                for src in sources:
+                    if is_copy_candidate(src):
+                        # Likely copied straight from disk; reading it here would read it twice
+                        read_q.put((src, None))
+                        continue
+                    try:
+                        data = src.read_bytes()
+                    except Exception:
+                        data = None  # let process_one open the path and report the error
+                    read_q.put((src, data))
+
+            threading.Thread(target=reader, daemon=True).start()
+
+            pending = {}
+
+            def collect(finished):
+                nonlocal successes, failures, done_count, last_tick
+                for fut in finished:
+                    src = pending.pop(fut)
+                    try:
+                        out_path = fut.result()
+                        if out_path is None:
+                            failures += 1
+                        else:
+                            self.converted_paths.append(out_path)
+                            successes += 1
+                    except Exception as e:
+                        print(f"Failed: {src} -> {e}")
+                        failures += 1
+                    finally:
+                        # Throttle UI updates to ~30Hz; always report the final file
+                        done_count += 1
+                        now = time.monotonic()
+                        if now - last_tick > PROGRESS_INTERVAL or done_count == total:
+                            self.progress.after(0, self._set_progress, done_count)
+                            last_tick = now
+
+            # Pillow releases the GIL inside its codecs, so threads scale across cores
+            n_workers = min(total, os.cpu_count() or 1)
+            # Output names reserved so far; same-stem sources (e.g. from different
+            # folders) get "stem (i)" names instead of writing one file concurrently.
+            taken: Set[str] = set()
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                for _ in range(total):
+                    src, data = read_q.get()
+                    out_path = _reserve_output_path(out_dir, f"{src.stem}{suffix}", f".{out_ext}", taken)
+                    pending[executor.submit(process_one, src, out_path, data)] = src
+                    # One task per worker in flight; read_q already holds the next files
+                    if len(pending) >= n_workers:
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(finished)
+                collect(as_completed(list(pending)))
             def done():
                 self.convert_btn.config(state="normal")
                 self.status_var.set(f"Done. Converted {successes} file(s), {failures} failed. Output: {out_dir}")
@@ -511,6 +763,9 @@ class App(TkinterDnD.Tk if TkinterDnD else tk.Tk):
 
 def main():
     app = App()
+    # Pillow-SIMD releases carry a ".postN" version suffix
+    if "post" in PIL.__version__:
+        app.status_var.set(f"{app.status_var.get()} Pillow-SIMD detected ({PIL.__version__}).")
     app.mainloop()
 
 